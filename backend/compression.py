@@ -0,0 +1,70 @@
+"""
+Transparent compression of JSON API responses
+Brotli is used when the optional `brotli` package is installed,
+otherwise responses fall back to gzip
+"""
+
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses smaller than this are sent uncompressed
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+def choose_encoding(accept_encoding):
+    """Pick the best supported encoding from an Accept-Encoding header"""
+    accepted = set()
+    for part in accept_encoding.split(','):
+        token, _, params = part.strip().partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(token.strip().lower())
+
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+def compress_body(data, encoding):
+    """Compress raw bytes with the given content encoding"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+def compress_response(response, accept_encoding):
+    """
+    Compress a JSON response in place if the client accepts it
+    and the body is larger than COMPRESS_MIN_SIZE
+    """
+    response.vary.add('Accept-Encoding')
+
+    if (response.direct_passthrough
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or not response.is_json):
+        return response
+
+    encoding = choose_encoding(accept_encoding or '')
+    if not encoding:
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    response.set_data(compress_body(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
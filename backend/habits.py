@@ -99,6 +99,32 @@ def get_habits_with_calculations(user_id, year, month):
     
     return result
 
+def pack_habits_compact(habits, year, month):
+    """
+    Pack calculated habits into the compact columnar wire format
+    Each month of days becomes a bitmask (bit 0 = day 1) instead of a
+    31-element list, and per-habit fields become parallel arrays
+    """
+    days_in_month = monthrange(year, month)[1]
+    
+    masks = []
+    for habit in habits:
+        mask = 0
+        for index, value in enumerate(habit['days'][:days_in_month]):
+            if value:
+                mask |= 1 << index
+        masks.append(mask)
+    
+    return {
+        'format': 'compact',
+        'days_in_month': days_in_month,
+        'ids': [h['id'] for h in habits],
+        'names': [h['name'] for h in habits],
+        'totals': [h['total'] for h in habits],
+        'percent_complete': [h['percent_complete'] for h in habits],
+        'days': masks
+    }
+
 def toggle_day_completion(user_id, habit_id, date, completed):
     """
     Toggle completion status for a specific day
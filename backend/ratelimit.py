@@ -0,0 +1,173 @@
+"""
+Per-user rate limiting and admission control for write endpoints
+Writes rewrite the shared JSON files, so clients are throttled with a
+token bucket and excess concurrent writes are turned away immediately
+instead of queueing on the file locks
+"""
+
+import json
+import math
+import os
+import time
+from functools import wraps
+from threading import Lock, BoundedSemaphore
+from flask import jsonify
+from backend.database import DATA_DIR
+
+# Token bucket settings (tokens per second, bucket size)
+WRITE_RATE = float(os.environ.get('WRITE_RATE', 5))
+WRITE_BURST = float(os.environ.get('WRITE_BURST', 20))
+
+# Maximum number of write requests handled at once per process
+WRITE_CONCURRENCY = int(os.environ.get('WRITE_CONCURRENCY', 4))
+
+# 'memory' (default) or 'file' to share buckets between local workers
+RATELIMIT_BACKEND = os.environ.get('RATELIMIT_BACKEND', 'memory')
+RATELIMIT_FILE = os.path.join(DATA_DIR, 'ratelimit.json')
+
+if WRITE_RATE <= 0:
+    raise ValueError('WRITE_RATE must be greater than 0')
+if WRITE_BURST < 1:
+    raise ValueError('WRITE_BURST must be at least 1')
+if WRITE_CONCURRENCY < 1:
+    raise ValueError('WRITE_CONCURRENCY must be at least 1')
+
+def take_token(buckets, key, now):
+    """
+    Take one token from the bucket for key
+    Returns 0 if allowed, otherwise seconds until a token is available
+    """
+    tokens, updated = buckets.get(key, (WRITE_BURST, now))
+    tokens = min(WRITE_BURST, tokens + (now - updated) * WRITE_RATE)
+
+    if tokens >= 1:
+        buckets[key] = (tokens - 1, now)
+        return 0
+
+    buckets[key] = (tokens, now)
+    return (1 - tokens) / WRITE_RATE
+
+def empty_counts():
+    return {
+        'rate_limited': 0,
+        'overloaded': 0
+    }
+
+class MemoryBucketStore:
+    """Token buckets and rejection counters held in this process"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.rejected = empty_counts()
+        self.lock = Lock()
+
+    def take(self, key):
+        with self.lock:
+            return take_token(self.buckets, key, time.time())
+
+    def count_rejection(self, reason):
+        with self.lock:
+            self.rejected[reason] += 1
+
+    def get_rejection_counts(self):
+        with self.lock:
+            return dict(self.rejected)
+
+class FileBucketStore:
+    """
+    Token buckets and rejection counters shared between worker processes
+    through a locked local file
+    """
+
+    def __init__(self, filepath):
+        import fcntl  # POSIX only
+        self.fcntl = fcntl
+        self.filepath = filepath
+
+    def update(self, change):
+        """Apply change(state) to the shared state under an exclusive lock"""
+        os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+        with open(self.filepath, 'a+') as f:
+            self.fcntl.flock(f, self.fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                state = json.load(f)
+            except json.JSONDecodeError:
+                state = {}
+            if 'buckets' not in state:
+                state = {}
+            state.setdefault('buckets', {})
+            state.setdefault('rejected', empty_counts())
+
+            result = change(state)
+
+            f.seek(0)
+            f.truncate()
+            json.dump(state, f)
+        return result
+
+    def take(self, key):
+        def change(state):
+            buckets = {k: tuple(v) for k, v in state['buckets'].items()}
+            now = time.time()
+            retry_after = take_token(buckets, key, now)
+
+            # Drop buckets that have refilled completely
+            state['buckets'] = {
+                k: v for k, v in buckets.items()
+                if v[0] + (now - v[1]) * WRITE_RATE < WRITE_BURST
+            }
+            return retry_after
+
+        return self.update(change)
+
+    def count_rejection(self, reason):
+        def change(state):
+            state['rejected'][reason] = state['rejected'].get(reason, 0) + 1
+
+        self.update(change)
+
+    def get_rejection_counts(self):
+        return self.update(lambda state: dict(state['rejected']))
+
+if RATELIMIT_BACKEND == 'file':
+    bucket_store = FileBucketStore(RATELIMIT_FILE)
+else:
+    bucket_store = MemoryBucketStore()
+
+write_slots = BoundedSemaphore(WRITE_CONCURRENCY)
+
+def count_rejection(reason):
+    bucket_store.count_rejection(reason)
+
+def get_rejection_counts():
+    """Snapshot of rejected request counters (shared across workers with the file backend)"""
+    return bucket_store.get_rejection_counts()
+
+def reject(message, status, retry_after):
+    """Build an error response with a Retry-After header"""
+    response = jsonify({'error': message})
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+def limit_writes(f):
+    """Decorator to rate limit and cap concurrency of write routes (use inside require_auth)"""
+    @wraps(f)
+    def decorated(user, *args, **kwargs):
+        # Claim a slot first so a busy server doesn't spend the user's tokens
+        if not write_slots.acquire(blocking=False):
+            count_rejection('overloaded')
+            return reject('Server busy, please try again', 503, 1)
+
+        try:
+            retry_after = bucket_store.take(user['id'])
+            if retry_after:
+                count_rejection('rate_limited')
+                return reject('Too many requests, please slow down', 429, retry_after)
+
+            return f(user, *args, **kwargs)
+        finally:
+            write_slots.release()
+
+    return decorated
@@ -7,12 +7,39 @@ from datetime import datetime
 from backend.auth import register_user, login_user, require_auth
 from backend.habits import (
     create_habit, update_habit_name, delete_user_habit,
-    get_habits_with_calculations, toggle_day_completion
+    get_habits_with_calculations, toggle_day_completion, pack_habits_compact
 )
 from backend.analytics import calculate_dashboard_metrics, get_monthly_trend
+from backend.compression import compress_response
+from backend.ratelimit import limit_writes, get_rejection_counts
 
 api_bp = Blueprint('api', __name__)
 
+COMPACT_MIMETYPE = 'application/vnd.tasktraq.compact+json'
+
+def wants_compact():
+    """Check if the client asked for the compact habit format"""
+    if request.args.get('format') == 'compact':
+        return True
+    # Require the compact type to be named explicitly, so */* doesn't match
+    return any(
+        mimetype == COMPACT_MIMETYPE and quality > 0
+        for mimetype, quality in request.accept_mimetypes
+    )
+
+def serialize_habits(habits, year, month):
+    """Serialize calculated habits in the format the client negotiated"""
+    if wants_compact():
+        return pack_habits_compact(habits, year, month)
+    return habits
+
+@api_bp.after_request
+def api_compress(response):
+    """Compress large JSON responses"""
+    # Habit payloads are negotiated on Accept as well as the query string
+    response.vary.add('Accept')
+    return compress_response(response, request.headers.get('Accept-Encoding'))
+
 # ==================== AUTHENTICATION ROUTES ====================
 
 @api_bp.route('/auth/register', methods=['POST'])
@@ -56,13 +83,14 @@ def api_get_habits(user):
     
     habits = get_habits_with_calculations(user['id'], year, month)
     return jsonify({
-        'habits': habits,
+        'habits': serialize_habits(habits, year, month),
         'year': year,
         'month': month
     }), 200
 
 @api_bp.route('/habits', methods=['POST'])
 @require_auth
+@limit_writes
 def api_create_habit(user):
     """Create a new habit"""
     data = request.get_json()
@@ -79,6 +107,7 @@ def api_create_habit(user):
 
 @api_bp.route('/habits/<habit_id>', methods=['PUT'])
 @require_auth
+@limit_writes
 def api_update_habit(user, habit_id):
     """Update habit name"""
     data = request.get_json()
@@ -95,6 +124,7 @@ def api_update_habit(user, habit_id):
 
 @api_bp.route('/habits/<habit_id>', methods=['DELETE'])
 @require_auth
+@limit_writes
 def api_delete_habit(user, habit_id):
     """Delete a habit"""
     success, error = delete_user_habit(habit_id, user['id'])
@@ -105,6 +135,7 @@ def api_delete_habit(user, habit_id):
 
 @api_bp.route('/habits/<habit_id>/day/<date>', methods=['PUT'])
 @require_auth
+@limit_writes
 def api_toggle_day(user, habit_id, date):
     """Toggle day completion (0 or 1)"""
     data = request.get_json()
@@ -124,7 +155,7 @@ def api_toggle_day(user, habit_id, date):
     
     return jsonify({
         'message': 'Day updated successfully',
-        'habits': habits
+        'habits': serialize_habits(habits, year, month)
     }), 200
 
 # ==================== DASHBOARD ROUTES ====================
@@ -162,4 +193,7 @@ def api_get_trend(user):
 @api_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({'status': 'ok'}), 200
\ No newline at end of file
+    return jsonify({
+        'status': 'ok',
+        'rejected_writes': get_rejection_counts()
+    }), 200
\ No newline at end of file
@@ -24,6 +24,11 @@ async function apiCall(url, method = 'GET', body = null) {
     const response = await fetch(url, options);
     const data = await response.json();
     
+    // Expand compact habit payloads back into per-habit objects
+    if (data.habits && data.habits.format === 'compact') {
+        data.habits = decodeCompactHabits(data.habits);
+    }
+    
     if (!response.ok) {
         // Token expired or invalid
         if (response.status === 401) {
@@ -38,6 +43,30 @@ async function apiCall(url, method = 'GET', body = null) {
     return data;
 }
 
+/**
+ * Decode the compact columnar habit format
+ * Each month is a bitmask where bit 0 is day 1
+ */
+function decodeCompactHabits(packed) {
+    return packed.ids.map((id, i) => {
+        const days = [];
+        for (let day = 1; day <= 31; day++) {
+            if (day > packed.days_in_month) {
+                days.push(null);
+            } else {
+                days.push((packed.days[i] >>> (day - 1)) & 1);
+            }
+        }
+        return {
+            id,
+            name: packed.names[i],
+            days,
+            total: packed.totals[i],
+            percent_complete: packed.percent_complete[i]
+        };
+    });
+}
+
 /**
  * Format date as YYYY-MM-DD
  */